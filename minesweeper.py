@@ -1,5 +1,35 @@
+import collections
+import functools
 import itertools
 import random
+import sys
+
+import numpy as np
+
+try:
+    import pycosat
+except ImportError:
+    pycosat = None
+
+# Shared empty default for lookups of cells that no sentence mentions
+_NO_SENTENCES = frozenset()
+
+
+@functools.lru_cache(maxsize=None)
+def _neighbor_masks(height, width):
+    """
+    Returns a tuple with the bitmask of the neighbors of every cell
+    of a height x width board, indexed by bit position.
+    """
+    masks = []
+    for i, j in itertools.product(range(height), range(width)):
+        mask = 0
+        for ni in range(max(i - 1, 0), min(i + 2, height)):
+            for nj in range(max(j - 1, 0), min(j + 2, width)):
+                if (ni, nj) != (i, j):
+                    mask |= 1 << (ni * width + nj)
+        masks.append(mask)
+    return tuple(masks)
 
 
 class Minesweeper():
@@ -15,20 +45,18 @@ class Minesweeper():
         self.mines = set()
 
         # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
+        self.board = np.zeros((self.height, self.width), dtype=np.bool_)
 
         # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
+        for index in random.sample(range(self.height * self.width), mines):
+            i, j = divmod(index, self.width)
+            self.mines.add((i, j))
+            self.board[i, j] = True
+
+        # Mines in the rectangle above and left of every cell, padded with a zero row and column
+        integral = np.zeros((self.height + 1, self.width + 1), dtype=np.int64)
+        integral[1:, 1:] = self.board.cumsum(0).cumsum(1)
+        self.integral = integral.tolist()
 
         # At first, player has found no mines
         self.mines_found = set()
@@ -38,19 +66,16 @@ class Minesweeper():
         Prints a text-based representation
         of where mines are located.
         """
-        for i in range(self.height):
-            print("--" * self.width + "-")
-            for j in range(self.width):
-                if self.board[i][j]:
-                    print("|X", end="")
-                else:
-                    print("| ", end="")
-            print("|")
-        print("--" * self.width + "-")
+        separator = "--" * self.width + "-"
+        lines = []
+        for row in self.board:
+            lines.append(separator)
+            lines.append("".join("|X" if mine else "| " for mine in row) + "|")
+        lines.append(separator)
+        sys.stdout.write("\n".join(lines) + "\n")
 
     def is_mine(self, cell):
-        i, j = cell
-        return self.board[i][j]
+        return bool(self.board[cell])
 
     def nearby_mines(self, cell):
         """
@@ -59,23 +84,16 @@ class Minesweeper():
         not including the cell itself.
         """
 
-        # Keep count of nearby mines
-        count = 0
-
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
+        i, j = cell
 
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
+        # Clip the 3x3 neighbourhood to the board and sum its mines from four corners
+        i0, i1 = max(i - 1, 0), min(i + 2, self.height)
+        j0, j1 = max(j - 1, 0), min(j + 2, self.width)
+        integral = self.integral
+        count = integral[i1][j1] - integral[i0][j1] - integral[i1][j0] + integral[i0][j0]
 
-        return count
+        # Ignore the cell itself
+        return count - (cell in self.mines)
 
     def won(self):
         """
@@ -87,49 +105,84 @@ class Minesweeper():
 class Sentence():
     """
     Logical statement about a Minesweeper game
-    A sentence consists of a set of board cells,
-    and a count of the number of those cells which are mines.
+    A sentence consists of a set of board cells, stored as a bitmask
+    with one bit per cell, and a count of the number of those cells
+    which are mines.
+
+    Sentences compare and hash by identity, since cells and count change
+    while a sentence sits in the cell index; MinesweeperAI deduplicates
+    them by their (cells, count) keys instead.
     """
 
     def __init__(self, cells, count):
-        self.cells = set(cells)
+        self.cells = cells
         self.count = count
 
-    def __eq__(self, other):
-        return self.cells == other.cells and self.count == other.count
+        # Cached known_mines/known_safes results, recomputed once cells change
+        self._dirty = True
+        self._known_mines = 0
+        self._known_safes = 0
 
     def __str__(self):
-        return f"{self.cells} = {self.count}"
+        return f"{self.cells:#x} = {self.count}"
 
     def known_mines(self):
         """
-        Returns the set of all cells in self.cells known to be mines.
+        Returns the bitmask of all cells in self.cells known to be mines.
         """
-        return self.cells if len(self.cells) == self.count and self.count != 0 else None
+        if self._dirty:
+            self._refresh()
+        return self._known_mines
 
     def known_safes(self):
         """
-        Returns the set of all cells in self.cells known to be safe.
+        Returns the bitmask of all cells in self.cells known to be safe.
         """
-        return self.cells if self.count == 0 else None
+        if self._dirty:
+            self._refresh()
+        return self._known_safes
 
-    def mark_mine(self, cell):
+    def _refresh(self):
+        """
+        Recomputes the cached known mines and known safes.
+        """
+        self._known_mines = self.cells if self.cells.bit_count() == self.count and self.count != 0 else 0
+        self._known_safes = self.cells if self.count == 0 else 0
+        self._dirty = False
+
+    def mark_mine(self, bit):
+        """
+        Updates internal knowledge representation given the fact that
+        the cell with the given bit is known to be a mine.
+        """
+        self.mark_mines(bit)
+
+    def mark_safe(self, bit):
         """
         Updates internal knowledge representation given the fact that
-        a cell is known to be a mine.
+        the cell with the given bit is known to be safe.
         """
-        if cell in self.cells:
-            self.cells.remove(cell)
-            self.count -= 1
+        self.mark_safes(bit)
 
+    def mark_mines(self, cells):
+        """
+        Updates internal knowledge representation given the fact that
+        every cell in the bitmask cells is known to be a mine.
+        """
+        common = self.cells & cells
+        if common:
+            self.cells &= ~common
+            self.count -= common.bit_count()
+            self._dirty = True
 
-    def mark_safe(self, cell):
+    def mark_safes(self, cells):
         """
         Updates internal knowledge representation given the fact that
-        a cell is known to be safe.
+        every cell in the bitmask cells is known to be safe.
         """
-        if cell in self.cells:
-            self.cells.remove(cell)
+        if self.cells & cells:
+            self.cells &= ~cells
+            self._dirty = True
 
 
 class MinesweeperAI():
@@ -137,11 +190,12 @@ class MinesweeperAI():
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mines=8):
 
-        # Set initial height and width
+        # Set initial height, width, and number of mines
         self.height = height
         self.width = width
+        self.total_mines = mines
 
         # Keep track of which cells have been clicked on
         self.moves_made = set()
@@ -150,26 +204,153 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
+        # The same cells as bitmasks
+        self.mines_mask = 0
+        self.safes_mask = 0
+
+        # Flags of the cells that are neither clicked on nor known mines, indexed by bit position
+        self.possible_moves = np.ones(height * width, dtype=np.bool_)
+
+        # Number of cells still flagged in possible_moves
+        self._unknown_cells = height * width
+
+        # Stack of safe cells that may not have been clicked on yet
+        self.safe_queue = []
+
         # List of sentences about the game known to be true
         self.knowledge = []
 
+        # (cells, count) keys of the sentences in knowledge, for O(1) lookups
+        self._knowledge_keys = set()
+
+        # Index from each cell's bit position to the sentences that mention it
+        self.cell_to_sentences = collections.defaultdict(set)
+
+        # Bitmask of the neighbors of every cell, indexed by bit position and shared between games
+        self.neighbor_mask = _neighbor_masks(height, width)
+
+    def cell_bit(self, cell):
+        """
+        Returns the bitmask with only the bit of the given cell set.
+        """
+        i, j = cell
+        return 1 << (i * self.width + j)
+
+    def cells_of(self, mask):
+        """
+        Returns the list of (i, j) cells whose bits are set in mask.
+        """
+        return [divmod(index, self.width) for index in self._bit_indices(mask)]
+
+    @staticmethod
+    def _bit_indices(mask):
+        """
+        Yields the position of every bit set in mask, lowest first.
+        """
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    def _add_sentence(self, sentence):
+        """
+        Adds a sentence to the knowledge base unless an equal
+        sentence is already known.
+        """
+        key = (sentence.cells, sentence.count)
+        if key in self._knowledge_keys:
+            return False
+        self._knowledge_keys.add(key)
+        self.knowledge.append(sentence)
+        for index in self._bit_indices(sentence.cells):
+            self.cell_to_sentences[index].add(sentence)
+        return True
+
+    def _prune_knowledge(self):
+        """
+        Removes every empty sentence from the knowledge base in one pass.
+        Empty sentences mention no cells, so the cell index is unaffected.
+        """
+        knowledge = []
+        for sentence in self.knowledge:
+            if sentence.cells:
+                knowledge.append(sentence)
+            else:
+                self._knowledge_keys.discard((sentence.cells, sentence.count))
+        self.knowledge = knowledge
+
+    def _sentences_with(self, mask):
+        """
+        Returns the sentences in the knowledge base that mention
+        at least one of the cells in mask.
+        """
+        sentences = set()
+        for index in self._bit_indices(mask):
+            sentences |= self.cell_to_sentences.get(index, _NO_SENTENCES)
+        return list(sentences)
+
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
-        self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self.mark_mines(self.cell_bit(cell))
 
     def mark_safe(self, cell):
         """
         Marks a cell as safe, and updates all knowledge
         to mark that cell as safe as well.
         """
-        self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        self.mark_safes(self.cell_bit(cell))
+
+    def mark_mines(self, cells):
+        """
+        Marks every cell in the bitmask cells as a mine, and updates
+        each affected sentence once for all of them.
+        """
+        self.mines_mask |= cells
+        sentences = set()
+        for index in self._bit_indices(cells):
+            self.mines.add(divmod(index, self.width))
+            if self.possible_moves[index]:
+                self.possible_moves[index] = False
+                self._unknown_cells -= 1
+            sentences |= self.cell_to_sentences.pop(index, _NO_SENTENCES)
+        for sentence in sentences:
+            self._knowledge_keys.discard((sentence.cells, sentence.count))
+            sentence.mark_mines(cells)
+            self._rekey(sentence)
+
+    def mark_safes(self, cells):
+        """
+        Marks every cell in the bitmask cells as safe, and updates
+        each affected sentence once for all of them.
+        """
+        self.safes_mask |= cells
+        sentences = set()
+        for index in self._bit_indices(cells):
+            cell = divmod(index, self.width)
+            if cell not in self.safes and cell not in self.moves_made:
+                self.safe_queue.append(cell)
+            self.safes.add(cell)
+            sentences |= self.cell_to_sentences.pop(index, _NO_SENTENCES)
+        for sentence in sentences:
+            self._knowledge_keys.discard((sentence.cells, sentence.count))
+            sentence.mark_safes(cells)
+            self._rekey(sentence)
+
+    def _rekey(self, sentence):
+        """
+        Records the new key of a sentence changed by marking, or empties the
+        sentence if an equal one is already known so it gets pruned.
+        """
+        key = (sentence.cells, sentence.count)
+        if key not in self._knowledge_keys:
+            self._knowledge_keys.add(key)
+            return
+        for index in self._bit_indices(sentence.cells):
+            self.cell_to_sentences[index].discard(sentence)
+        sentence.mark_safes(sentence.cells)
 
     def add_knowledge(self, cell, count):
         """
@@ -186,83 +367,196 @@ class MinesweeperAI():
             5) add any new sentences to the AI's knowledge base
                if they can be inferred from existing knowledge
         """
+        # Sentences mentioning the clicked cell change once it is marked safe
+        worklist = collections.deque(self._sentences_with(self.cell_bit(cell)))
+
+        # Bit position of the cell
+        index = cell[0] * self.width + cell[1]
+
         # Mark a cell as a move that has been made
         self.moves_made.add(cell)
+        if self.possible_moves[index]:
+            self.possible_moves[index] = False
+            self._unknown_cells -= 1
 
         # Mark a cell as safe
         self.mark_safe(cell)
 
-        # Create new set to store undetermined cells
-        undetermined_cells = set()
-
         # Add a new sentence to the AI's knowledge based on the value of `cell` and `count`
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
+        neighbors = self.neighbor_mask[index]
 
-                # Ignore the cell itself and the marked safe cells
-                if (i, j) == cell or (i, j) in self.safes:
-                    continue
+        # Discount the neighbors known to be mines
+        count -= (neighbors & self.mines_mask).bit_count()
 
-                # Check if cell is mine and update count
-                if (i, j) in self.mines:
-                    count -= 1
-                    continue
-
-                # Update set of undetermined cells
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    undetermined_cells.add((i, j))
+        # Keep the neighbors not known to be safe or mines as undetermined cells
+        undetermined_cells = neighbors & ~self.safes_mask & ~self.mines_mask
 
         # Create new knowledge sentence
         new_knowledge_sentence = Sentence(undetermined_cells, count)
 
         # Add new knowledge sentence to knowledge base
-        self.knowledge.append(new_knowledge_sentence)
+        if self._add_sentence(new_knowledge_sentence):
+            worklist.append(new_knowledge_sentence)
 
-        # Mark any additional cells as safe or as mines if it can be concluded based on the AI's knowledge base
-        # Loop through each sentence in knowledge base
-        for sentence in self.knowledge:
+        # Mark any additional cells and add any new sentences that can be inferred
+        self._infer(worklist)
 
+        # Fall back to the SAT solver when the subset rule finds no safe move
+        if pycosat is not None and self.make_safe_move() is None:
+            safes, mines = self._solve_frontier()
+            worklist = collections.deque(self._sentences_with(safes | mines))
+            self.mark_safes(safes)
+            self.mark_mines(mines)
+            self._infer(worklist)
+
+        # Remove empty sentences from knowledge base
+        self._prune_knowledge()
+
+    def _infer(self, worklist):
+        """
+        Applies the known mines, known safes and subset rules to every
+        sentence in worklist, queueing each sentence that changes or is
+        inferred, until the worklist is empty.
+        """
+        # Keep inferring until no queued sentence yields new knowledge
+        while worklist:
+            sentence = worklist.popleft()
+
+            # Skip sentences emptied since they were queued
+            if not sentence.cells:
+                continue
+
+            # Mark any additional cells as safe or as mines if it can be concluded based on the AI's knowledge base
             # Check if all cells in sentence are known to be safe
-            if sentence.known_safes():
+            safes = sentence.known_safes()
+            if safes:
 
-                # Loop through all cells in the copy of set then marked it
-                for cell in sentence.known_safes().copy():
-                    self.mark_safe(cell)
+                # Queue every sentence the marking changes
+                worklist.extend(self._sentences_with(safes))
+
+                # Mark all cells in the sentence at once
+                self.mark_safes(safes)
+                continue
 
             # Check if all cells in sentence are known to be mines
-            if sentence.known_mines():
+            mines = sentence.known_mines()
+            if mines:
 
-                # Loop through all cells in the copy of set then marked it
-                for cell in sentence.known_mines().copy():
-                    self.mark_mine(cell)
+                # Queue every sentence the marking changes
+                worklist.extend(self._sentences_with(mines))
 
-        # Add any new sentences to the AI's knowledge base if they can be inferred from existing knowledge
-        # Loop through each sentence in knowledge base
-        for sentence in self.knowledge:
+                # Mark all cells in the sentence at once
+                self.mark_mines(mines)
+                continue
 
-            # Remove if it is an empty sentence
-            if len(sentence.cells) == 0:
-                self.knowledge.remove(sentence)
+            # Add any new sentences to the AI's knowledge base if they can be inferred from existing knowledge
+            # Only sentences sharing a cell with this sentence can be its subsets or supersets
+            for other in self._sentences_with(sentence.cells):
 
-            # Check if sentences is different
-            if new_knowledge_sentence.cells != sentence.cells:
+                # Subtract the smaller sentence from the one containing it
+                common = sentence.cells & other.cells
+                if common == sentence.cells != other.cells:
+                    superset, subset = other, sentence
+                elif common == other.cells != sentence.cells:
+                    superset, subset = sentence, other
+                else:
+                    continue
 
-                # Check if new sentence is a subset of existing sentence in knowleage base
-                if new_knowledge_sentence.cells.issubset(sentence.cells) and sentence.count > 0 and new_knowledge_sentence.count > 0:
+                # Create new sentence of subset for knowledge base
+                new_subset_sentence = Sentence(superset.cells & ~subset.cells, superset.count - subset.count)
 
-                    # Get the subset cells
-                    new_subset_cells = sentence.cells - new_knowledge_sentence.cells
+                # Add new subset sentence if it is not in knowledge base
+                if self._add_sentence(new_subset_sentence):
+                    worklist.append(new_subset_sentence)
 
-                    # Get the subset count
-                    new_subset_count = sentence.count - new_knowledge_sentence.count
+    def _solve_frontier(self):
+        """
+        Returns the bitmasks of the cells in the knowledge base that a
+        SAT solver proves to be safe and to be mines, respectively.
+        """
+        safes = mines = 0
+        for sentences in self._frontier_components():
+            component_safes, component_mines = self._solve_component(sentences)
+            safes |= component_safes
+            mines |= component_mines
+        return safes, mines
+
+    def _frontier_components(self):
+        """
+        Yields the non-empty sentences of the knowledge base grouped into
+        components, where sentences sharing a cell are in the same component.
+        """
+        seen = set()
+        for sentence in self.knowledge:
+            if not sentence.cells or sentence in seen:
+                continue
+            seen.add(sentence)
+            component = []
+            stack = [sentence]
+            while stack:
+                current = stack.pop()
+                component.append(current)
+                for other in self._sentences_with(current.cells):
+                    if other not in seen:
+                        seen.add(other)
+                        stack.append(other)
+            yield component
+
+    def _solve_component(self, sentences):
+        """
+        Returns the bitmasks of the cells of one frontier component that
+        are safe and that are mines in every assignment satisfying it.
+        """
+        # Nothing can be proven from inconsistent knowledge
+        for sentence in sentences:
+            if not 0 <= sentence.count <= sentence.cells.bit_count():
+                return 0, 0
+
+        # Number the component's cells as SAT variables 1..n
+        frontier = 0
+        for sentence in sentences:
+            frontier |= sentence.cells
+        variables = {index: var for var, index in enumerate(self._bit_indices(frontier), 1)}
+
+        # Encode every sentence as "exactly count of its cells are mines"
+        cnf = []
+        for sentence in sentences:
+            cells = [variables[index] for index in self._bit_indices(sentence.cells)]
+            for group in itertools.combinations(cells, sentence.count + 1):
+                cnf.append([-var for var in group])
+            for group in itertools.combinations(cells, len(cells) - sentence.count + 1):
+                cnf.append(list(group))
+
+        # Nothing can be proven if the sentences contradict each other
+        model = pycosat.solve(cnf)
+        if model == "UNSAT":
+            return 0, 0
+
+        # Value of every variable that has been the same in all models found so far
+        candidates = {abs(literal): literal > 0 for literal in model}
+
+        # A variable is forced if it cannot take the opposite of its model value
+        safes = mines = 0
+        for index, var in variables.items():
+            if var not in candidates:
+                continue
+            is_mine = candidates[var]
+            cnf.append([-var if is_mine else var])
+            model = pycosat.solve(cnf)
+            cnf.pop()
+            if model == "UNSAT":
+                if is_mine:
+                    mines |= 1 << index
+                else:
+                    safes |= 1 << index
+                continue
 
-                    # Create new sentence of subset for knowledge base
-                    new_subset_sentence = Sentence(new_subset_cells, new_subset_count)
+            # Variables that differ in this model are not forced either
+            for literal in model:
+                if candidates.get(abs(literal), literal > 0) != (literal > 0):
+                    del candidates[abs(literal)]
 
-                    # Add new subset sentence if it is not in knowledge base
-                    if new_subset_sentence not in self.knowledge:
-                        self.knowledge.append(new_subset_sentence)
+        return safes, mines
 
     def make_safe_move(self):
         """
@@ -273,10 +567,10 @@ class MinesweeperAI():
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        for cell in self.safes:
-            if cell not in self.moves_made:
-                return cell
-        return None
+        # Drop cells that have been clicked on since they were queued
+        while self.safe_queue and self.safe_queue[-1] in self.moves_made:
+            self.safe_queue.pop()
+        return self.safe_queue[-1] if self.safe_queue else None
 
     def make_random_move(self):
         """
@@ -285,61 +579,55 @@ class MinesweeperAI():
             1) have not already been chosen, and
             2) are not known to be mines
         """
-        # Create a dictionary to store all possible moves with its probability to be a mine
-        possible_moves = {}
-
-        # Calcualte number of mines left on the board
-        num_mines_left = 8 - len(self.mines)
-
         # Calculate number of possible moves left on the board
-        num_possible_moves = (self.height * self.width) - (len(self.moves_made) + len(self.mines))
+        num_possible_moves = self._unknown_cells
 
         # Check if there is any possible moves available
         if num_possible_moves == 0:
             return None
 
-        # Calculate the probability of a cell to be a mine without knowledge base
-        cells_to_mines_prob = num_mines_left / num_possible_moves
+        # Remove empty sentences from knowledge base
+        self._prune_knowledge()
 
-        # Get all possible moves to the dictionary with its probability to be a mine
-        for i in range(self.height):
-            for j in range(self.width):
-                if (i, j) not in self.moves_made and (i, j) not in self.mines:
-                    possible_moves[(i, j)] = cells_to_mines_prob
+        # Return any cell of a sentence with no mines before ranking moves, it is known to be safe
+        for sentence in self.knowledge:
+            if sentence.count == 0:
+                return divmod(next(self._bit_indices(sentence.cells)), self.width)
 
         # Make a move without knowledge base
         if not self.knowledge:
-            return random.choice(list(possible_moves))
+            return self._random_cell(np.flatnonzero(self.possible_moves))
+
+        # Calcualte number of mines left on the board
+        num_mines_left = self.total_mines - len(self.mines)
+
+        # Calculate the probability of a cell to be a mine without knowledge base
+        cells_to_mines_prob = num_mines_left / num_possible_moves
+
+        # Array of the probability of every cell to be a mine, indexed by bit position
+        mine_probs = np.full(self.height * self.width, cells_to_mines_prob)
 
         # Make better move with knowledge base to decrease the probality to be a mine
         # Loop through each sentence in our knowledge base
         for sentence in self.knowledge:
 
             # Get number of cells in each sentence
-            num_cells = len(sentence.cells)
-
-            # Check if sentence has no cells then remove it
-            if num_cells == 0:
-                self.knowledge.remove(sentence)
-                continue
+            num_cells = sentence.cells.bit_count()
 
             # Get number of mines in that sentence
             num_mines = sentence.count
 
-            # Calculate probability of cells in that sentence to be a mine
-            cell_to_mine_prob = num_mines / num_cells
-
-            # Loop through each cell in that sentence
-            for cell in sentence.cells:
-
-                # Update probability of that cell to the dictionary
-                possible_moves[cell] = cell_to_mine_prob
+            # Update probability of all cells in that sentence to be a mine
+            mine_probs[list(self._bit_indices(sentence.cells))] = num_mines / num_cells
 
         # Get the lowest probability
-        lowest_prob = min(possible_moves.values())
+        lowest_prob = mine_probs[self.possible_moves].min()
 
-        # Get the list of best possible moves with lowest probability to be mines
-        best_possible_moves = [move for move in possible_moves if possible_moves[move] == lowest_prob]
+        # Return a move among the possible moves with lowest probability to be mines
+        return self._random_cell(np.flatnonzero(self.possible_moves & (mine_probs == lowest_prob)))
 
-        # Return move with lowest probability to be mines
-        return random.choice(best_possible_moves)
+    def _random_cell(self, indices):
+        """
+        Returns the (i, j) cell of a bit position chosen at random from indices.
+        """
+        return divmod(int(random.choice(indices)), self.width)